@@ -1,4 +1,4 @@
-import pandas as pd
+import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
 import time
@@ -19,11 +19,14 @@ def robust_get(url, retries=3, base_sleep=0.2):
         time.sleep(sleep_time)
     return None
 
-def extract_codes_from_url(full_url):
-    resp = robust_get(full_url)
-    if not resp:
+def extract_codes_from_url(full_url, archive=None):
+    resp = archive.fetch(full_url, robust_get) if archive is not None else robust_get(full_url)
+    if not resp or resp.status_code != 200:
         return []
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    return parse_codes(resp.text, full_url)
+
+def parse_codes(html, full_url):
+    soup = BeautifulSoup(html, 'html.parser')
     codes_per_group = []
     for group in soup.select('.products-group'):
         title_tag = group.select_one('.title .label')
@@ -38,23 +41,55 @@ def extract_codes_from_url(full_url):
 
     return codes_per_group
 
-def process_row(row, id_col):
-    type_id = str(row[id_col])
+def get_full_url(row):
     product_url = str(row['product_url'])
     base_url = "https://www.bremboparts.com"
-    full_url = product_url if product_url.startswith('http') else base_url + product_url
+    return product_url if product_url.startswith('http') else base_url + product_url
+
+def to_records(type_id, id_col, code_title_pairs):
+    return [{id_col: type_id, 'code': code, 'title': group_title} for code, group_title in code_title_pairs]
+
+def process_row(row, id_col, archive=None):
+    type_id = str(row[id_col])
+    full_url = get_full_url(row)
     print(f"Processing: {full_url} ({id_col}={type_id})")
-    code_title_pairs = extract_codes_from_url(full_url)
+    return to_records(type_id, id_col, extract_codes_from_url(full_url, archive))
+
+def process_archived_dataframe(df, id_col, archive, max_workers=None):
+    """
+    Offline counterpart of process_dataframe: parses the archived pages in worker
+    processes instead of threads, since parsing is CPU-bound and needs no network.
+    """
+    ids_by_url = {}
+    for _, row in df.iterrows():
+        ids_by_url.setdefault(get_full_url(row), []).append(str(row[id_col]))
+
+    results = []
+    missing = 0
+    for full_url, future in archive.parse_in_processes(parse_codes, list(ids_by_url), max_workers):
+        try:
+            code_title_pairs = future.result()
+        except LookupError:
+            missing += 1
+            print(f"[WARN] {full_url} is not in the page archive")
+            continue
+        except Exception as e:
+            print(f"Exception in worker: {e}")
+            continue
+        for type_id in ids_by_url[full_url]:
+            results.extend(to_records(type_id, id_col, code_title_pairs))
 
-    if id_col == 'disp_id':
-        return [{'disp_id': type_id, 'code': code, 'title': group_title} for code, group_title in code_title_pairs]
+    if missing:
+        print(f"[WARN] {missing} {id_col} pages are missing from the page archive")
+    return results
 
-    return [{'type_id': type_id, 'code': code, 'title': group_title} for code, group_title in code_title_pairs]
+def process_dataframe(df, id_col, archive=None, max_workers=10):
+    if archive is not None and archive.read_only:
+        return process_archived_dataframe(df, id_col, archive, max_workers)
 
-def process_dataframe(df, id_col):
     results = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(process_row, row, id_col): idx for idx, row in df.iterrows()}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_row, row, id_col, archive): idx for idx, row in df.iterrows()}
         for future in as_completed(futures):
             try:
                 results.extend(future.result())
@@ -62,12 +97,36 @@ def process_dataframe(df, id_col):
                 print(f"Exception in worker: {e}")
     return results
 
-def main(type_csv_path, displacement_csv_path, output_type_csv_path, output_bike_csv_path):
+def write_results(results, id_col, output_csv_path):
+    """
+    Writes the extracted rows sorted by id_col. When nothing was extracted an existing CSV is
+    left alone (e.g. an archive without these pages), otherwise a header-only CSV is written
+    so the product stage can still run.
+    """
+    import pandas as pd
+
+    os.makedirs(os.path.dirname(output_csv_path) or '.', exist_ok=True)
+    if not results:
+        if os.path.exists(output_csv_path):
+            print(f"[WARN] No {id_col} rows extracted, leaving {output_csv_path} unchanged")
+            return
+        print(f"[WARN] No {id_col} rows extracted, writing header-only {output_csv_path}")
+        pd.DataFrame(columns=[id_col, 'code', 'title']).to_csv(output_csv_path, index=False, encoding='utf-8')
+        return
+
+    pd.DataFrame(results) \
+        .sort_values(by=id_col) \
+        .to_csv(output_csv_path, index=False, encoding='utf-8')
+    print(f"Done! {len(results)} rows written to {output_csv_path}")
+
+def main(type_csv_path, displacement_csv_path, output_type_csv_path, output_bike_csv_path, archive=None, max_workers=10):
+    import pandas as pd
+
     types = pd.read_csv(type_csv_path)
     displacements = pd.read_csv(displacement_csv_path)
 
-    type_results = process_dataframe(types, 'type_id')
-    disp_results = process_dataframe(displacements, 'disp_id')
+    type_results = process_dataframe(types, 'type_id', archive, max_workers)
+    disp_results = process_dataframe(displacements, 'disp_id', archive, max_workers)
 
     scraped_type_ids = {r['type_id'] for r in type_results}
     scraped_disp_ids = {r['disp_id'] for r in disp_results}
@@ -81,27 +140,23 @@ def main(type_csv_path, displacement_csv_path, output_type_csv_path, output_bike
     print("Missing type_ids:", missing_type_ids)
     print("Missing disp_ids:", missing_disp_ids)
 
-    if missing_type_ids:
+    # an offline retry would only read the same archive again
+    offline = archive is not None and archive.read_only
+
+    if missing_type_ids and not offline:
         print("Retrying missing type_ids:", missing_type_ids)
         retry_types = types[types['type_id'].astype(str).isin(missing_type_ids)]
-        retry_types_results = process_dataframe(retry_types, 'type_id')
+        retry_types_results = process_dataframe(retry_types, 'type_id', archive, max_workers)
         type_results.extend(retry_types_results)
 
-    if missing_disp_ids:
+    if missing_disp_ids and not offline:
         print("Retrying missing disp_ids:", missing_disp_ids)
         retry_disps = displacements[displacements['disp_id'].astype(str).isin(missing_disp_ids)]
-        retry_disps_results = process_dataframe(retry_disps, 'disp_id')
+        retry_disps_results = process_dataframe(retry_disps, 'disp_id', archive, max_workers)
         disp_results.extend(retry_disps_results)
 
-    pd.DataFrame(type_results) \
-        .sort_values(by="type_id") \
-        .to_csv(output_type_csv_path, index=False, encoding='utf-8')
-    print(f"Done! {len(type_results)} rows written to {output_type_csv_path}")
-
-    pd.DataFrame(disp_results) \
-        .sort_values(by="disp_id") \
-        .to_csv(output_bike_csv_path, index=False, encoding='utf-8')
-    print(f"Done! {len(disp_results)} rows written to {output_bike_csv_path}")
+    write_results(type_results, 'type_id', output_type_csv_path)
+    write_results(disp_results, 'disp_id', output_bike_csv_path)
 
 if __name__ == "__main__":
     main('Data/type.csv',
@@ -1,9 +1,7 @@
+import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
 from urllib.parse import urljoin
 
-import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
 
@@ -36,9 +34,9 @@ mapped_titles = {
 }
 
 
-def get_url(code, title, type):
-    base_url_vehicles = "https://www.bremboparts.com/europe/en/catalogue"
-    base_url_bikes = "https://www.bremboparts.com/europe/en/catalogue-bike"
+def get_url(code, title, type, region='europe', culture='en'):
+    base_url_vehicles = f"https://www.bremboparts.com/{region}/{culture}/catalogue"
+    base_url_bikes = f"https://www.bremboparts.com/{region}/{culture}/catalogue-bike"
 
     if type == 0:
         url = f"{base_url_vehicles}/{mapped_titles.get(title, 'unknown')}/{code.replace(' ', '_')}"
@@ -46,26 +44,56 @@ def get_url(code, title, type):
         url = f"{base_url_bikes}/{mapped_titles.get(title, 'unknown')}/{code.replace(' ', '_')}"
     return url
 
-def save_unique_products(input_csv: str, type):
+def save_unique_products(input_csv: str, type, region='europe', culture='en'):
+    import pandas as pd
+
     df = pd.read_csv(input_csv)
 
     df_unique = df.drop_duplicates(subset='code').reset_index(drop=True)
     df_unique['product_id'] = df_unique.index + 1
-    df_unique['url'] = df_unique.apply(lambda row: get_url(row['code'], row['title'], type), axis=1)
+    # a list rather than DataFrame.apply, which returns a DataFrame for a header-only relations CSV
+    df_unique['url'] = [get_url(code, title, type, region, culture)
+                        for code, title in zip(df_unique['code'], df_unique['title'])]
 
     out_df = df_unique[['product_id', 'code', 'title', 'url',]]
     return out_df
 
-def scrape_products_df(url):
+def fetch_product_page(url, archive=None, country=None):
+    """
+    Fetches a product page, sending country as the "cnt" market cookie like the models client does.
+    When a read-only archive is given the page is taken from it instead of the network.
+    """
+    import requests
+
+    def get(page_url):
+        return requests.get(page_url, cookies={'cnt': country} if country else None)
+
+    if archive is not None:
+        resp = archive.fetch(url, get)
+        if resp is None:
+            raise LookupError(f"{url} is not in the page archive.")
+    else:
+        resp = get(url)
+    resp.raise_for_status()
+    return resp
+
+def scrape_products_df(url, archive=None, country=None):
     """
     Given a URL pointing to a Brembo disc product page, fetches the page and returns
     a pandas DataFrame with one row. Columns are each technical specification label
     (under "Technical specifications") and "technical_image_url". If a spec is missing, its value is NaN.
     """
-    resp = requests.get(url)
-    resp.raise_for_status()
+    import pandas as pd
+
+    resp = fetch_product_page(url, archive, country)
+    return pd.DataFrame([parse_product_html(resp.text, url)])
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def parse_product_html(html, url):
+    """
+    Extracts the type, technical specifications and image URLs from a product page.
+    Returns a dict with one entry per column of the scraped row.
+    """
+    soup = BeautifulSoup(html, "html.parser")
 
     type_div = soup.find("div", class_="cluster-tag inline big")
     type_val = type_div.get("data-type") if type_div and type_div.has_attr("data-type") else None
@@ -103,36 +131,66 @@ def scrape_products_df(url):
         if img_tag and img_tag.has_attr("src"):
             technical_image_url = urljoin(url, img_tag["src"])
 
-    row_data = {"type": type_val, **specs, "image_url": product_image_url, "technical_image_url": technical_image_url}
-    df = pd.DataFrame([row_data])
-    return df
+    return {"type": type_val, **specs, "image_url": product_image_url, "technical_image_url": technical_image_url}
 
-def scrape_all_products_by_type(input_dataframe, output_csv: str, product_type: str):
+def scrape_all_products_by_type(input_dataframe, output_csv: str, product_type: str, archive=None, max_workers=10,
+                                country=None):
     """
     Reads the input CSV, filters rows where title == "Brake discs", and scrapes each URL
-    concurrently using threads. Returns a combined DataFrame of all scraped specs with
+    concurrently (threads when fetching, processes when parsing a read-only archive). Returns a combined DataFrame of all scraped specs with
     product_id included, and saves it to output_csv.
 
     :param input_csv: Path to the CSV file containing 'product_id', 'title', and 'url' columns.
     :param output_csv: Path where the combined CSV should be saved.
-    :param max_workers: Number of threads to use for concurrent scraping.
+    :param archive: Optional PageArchive that fetched pages are recorded into, or read from when read-only.
+    :param max_workers: Number of threads to use for concurrent scraping, or of worker
+                        processes when parsing pages from a read-only archive.
+    :param country: Market country code sent as cookie with every live request.
     """
+    import pandas as pd
+
     df = input_dataframe
 
     df_brake = df[df["title"] == product_type].reset_index(drop=True)
 
     df_brake["product_id"] = range(1, len(df_brake) + 1)
 
+    if df_brake.empty:
+        # header-only file so resume knows a category without products is done
+        os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
+        pd.DataFrame(columns=["product_id", "code"]).to_csv(output_csv, index=False)
+        return pd.DataFrame()
+
+    if archive is not None and archive.read_only:
+        results = scrape_archived_products(df_brake, product_type, archive, max_workers)
+    else:
+        results = scrape_products_concurrently(df_brake, product_type, archive, max_workers, country)
+
+    if results:
+        os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
+        combined = pd.concat(results, ignore_index=True, sort=False)
+        combined = combined.sort_values("product_id", ignore_index=True)
+        cols = ["product_id", "code"] + [c for c in combined.columns if c not in ("product_id", "code")]
+        combined = combined[cols]
+        combined = refactor_csv_columns(combined)
+        combined.to_csv(output_csv, index=False)
+        return combined
+    else:
+        return pd.DataFrame()
+
+
+def scrape_products_concurrently(df_brake, product_type, archive=None, max_workers=10, country=None):
+    """Fetches and parses every product page of df_brake in threads, returning one DataFrame per product."""
     results = []
 
     def worker(pid, code, url):
         print(f"Worker {pid} started. ({product_type})")
-        df_result = scrape_products_df(url)
+        df_result = scrape_products_df(url, archive, country)
         df_result["product_id"] = pid
         df_result["code"] = code
         return df_result
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_pid = {
             executor.submit(worker, row["product_id"], row["code"], row["url"]): row["product_id"]
             for _, row in df_brake.iterrows()
@@ -144,16 +202,41 @@ def scrape_all_products_by_type(input_dataframe, output_csv: str, product_type:
                 continue
             results.append(df_result)
 
-    if results:
-        combined = pd.concat(results, ignore_index=True, sort=False)
-        combined = combined.sort_values("product_id", ignore_index=True)
-        cols = ["product_id", "code"] + [c for c in combined.columns if c not in ("product_id", "code")]
-        combined = combined[cols]
-        combined = refactor_csv_columns(combined)
-        combined.to_csv(output_csv, index=False)
-        return combined
-    else:
-        return pd.DataFrame()
+    return results
+
+
+def scrape_archived_products(df_brake, product_type, archive, max_workers=None):
+    """
+    Offline counterpart of scrape_products_concurrently: parses the archived product pages
+    in worker processes, since parsing is CPU-bound and needs no network.
+    """
+    import pandas as pd
+
+    rows_by_url = {row["url"]: (row["product_id"], row["code"]) for _, row in df_brake.iterrows()}
+
+    results = []
+    missing = 0
+    for url, future in archive.parse_in_processes(parse_product_html, list(rows_by_url), max_workers):
+        try:
+            row_data = future.result()
+        except LookupError:
+            # typically a code found by new extraction logic that was never crawled
+            missing += 1
+            print(f"[WARN] {url} is not in the page archive")
+            continue
+        except Exception as e:
+            # error-status pages and extraction failures are what offline runs are for, so show them
+            print(f"Exception in worker: {url}: {e}")
+            continue
+        df_result = pd.DataFrame([row_data])
+        pid, code = rows_by_url[url]
+        df_result["product_id"] = pid
+        df_result["code"] = code
+        results.append(df_result)
+
+    if missing:
+        print(f"[WARN] {missing} {product_type} pages are missing from the page archive")
+    return results
 
 
 def refactor_csv_columns(df):
@@ -260,16 +343,29 @@ def refactor_csv_columns(df):
     return new_df
 
 
-def main():
-    products_df = save_unique_products("Data/Products/product-relations.csv", 0)
-    for title in list(mapped_titles.keys()):
-        file_name = f"{title.lower().replace(" ", "_")}.csv"
-        scrape_all_products_by_type(products_df, f"Data/Products/Vehicle/{file_name}", title)
+def main(data_dir='Data', archive=None, max_workers=10, region='europe', culture='en', resume=False, country=None):
+    """
+    Scrapes every product category for vehicles and bikes from the relations CSVs in data_dir.
+    With resume=True categories whose output CSV already exists are skipped.
+    """
+    products_dir = os.path.join(data_dir, 'Products')
+    sources = [
+        ('product-relations.csv', 0, os.path.join(products_dir, 'Vehicle'), ''),
+        ('bike-product-relations.csv', 1, os.path.join(products_dir, 'Bike'), 'bike_'),
+    ]
+    for relations_csv, vehicle_type, out_dir, prefix in sources:
+        outputs = {title: os.path.join(out_dir, f"{prefix}{title.lower().replace(' ', '_')}.csv")
+                   for title in mapped_titles}
+        if resume:
+            # checked before save_unique_products so a finished source never loads pandas or its CSV
+            outputs = {title: path for title, path in outputs.items() if not os.path.exists(path)}
+            if not outputs:
+                print(f"Skipping {relations_csv}, every category is already scraped.")
+                continue
 
-    bike_products_df = save_unique_products("Data/Products/bike-product-relations.csv", 1)
-    for title in list(mapped_titles.keys()):
-        file_name = f"{title.lower().replace(" ", "_")}.csv"
-        scrape_all_products_by_type(bike_products_df, f"Data/Products/Bike/bike_{file_name}", title)
+        products_df = save_unique_products(os.path.join(products_dir, relations_csv), vehicle_type, region, culture)
+        for title, output_csv in outputs.items():
+            scrape_all_products_by_type(products_df, output_csv, title, archive, max_workers, country)
 
 
 
@@ -4,10 +4,8 @@ import re
 import requests
 from functools import lru_cache
 
-from numpy.matlib import empty
 from requests.adapters import HTTPAdapter
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from apify_shared.utils import json_dumps
+from concurrent.futures import ThreadPoolExecutor
 
 
 class BremboAPIClient:
@@ -126,11 +124,8 @@ def save_all_csvs(brands, models, types, displacements, years, out_dir='Data'):
     write_csv('bikeYear.csv', ['year_id','disp_id','year_value'], years)
 
 
-def main():
+def main(out_dir='Data', region='europe', culture='en', country='MK', max_workers=20):
     base_url = 'https://www.bremboparts.com'
-    region = 'europe'
-    culture = 'en'
-    country = 'MK'
     vehicle_types = [('Car', 1), ('Truck', 2), ('Bike', 3)]
 
     client  = BremboAPIClient(base_url, region, culture, country)
@@ -212,12 +207,12 @@ def main():
         # print(f"[DEBUG] payload={payload!r} → url={res.get('url','')!r}")
         return (out_type, out_id, res.get('url',''))
 
-    with ThreadPoolExecutor(max_workers=20) as pool:
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
         for out_type,out_id,url in pool.map(job, todos):
             if out_type=='type': types_data[out_id-1] = types_data[out_id-1][:-1] + (url,)
             else: disp_data[out_id-1] = disp_data[out_id-1][:-1] + (url,)
 
-    save_all_csvs(brands_data, models_data, types_data, disp_data, year_data)
+    save_all_csvs(brands_data, models_data, types_data, disp_data, year_data, out_dir)
     print(f"Done: {len(brands_data)} brands, {len(models_data)} models, {len(types_data)} types, {len(disp_data)} disp, {len(year_data)} years")
 
 if __name__=='__main__':
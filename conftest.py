@@ -0,0 +1 @@
+# Keeps the repository root importable for tests/, since the scrapers are top-level modules.
@@ -0,0 +1,274 @@
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, fall back to zlib from the stdlib
+    zstandard = None
+
+
+INDEX_FILE = 'index.jsonl'
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+# read-only archive opened once in every worker process of PageArchive.parse_in_processes
+_worker_archive = None
+
+
+class ArchivedResponse:
+    """
+    Minimal stand-in for requests.Response built from an archived page,
+    so the extractors can parse it exactly like a live response.
+    """
+    def __init__(self, url: str, status_code: int, content: bytes, encoding: str = None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+
+            raise requests.HTTPError(f"{self.status_code} Error (archived) for url: {self.url}", response=self)
+
+
+class PageArchive:
+    """
+    Append-only store of fetched pages.
+
+    Every page body is compressed on its own (zstd when available, zlib otherwise)
+    and appended to the current segment file; index.jsonl maps each URL to its
+    segment, offset and length so a single page can be read back through mmap
+    without decompressing anything else. Reopening an existing archive always
+    starts a new segment, so written segments are never modified. When a URL is
+    archived more than once the latest record wins.
+
+    With read_only=True nothing is written and fetch() never touches the network.
+    """
+    def __init__(self, root: str, read_only: bool = False, segment_max_bytes: int = SEGMENT_MAX_BYTES,
+                 only_url: str = None):
+        self.root = root
+        self.read_only = read_only
+        self.segment_max_bytes = segment_max_bytes
+        self.index = {}
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._segment = None
+        self._segment_name = None
+        self._index_file = None
+        self._pool = None
+
+        if read_only and not os.path.isdir(root):
+            raise FileNotFoundError(f"No page archive at {root}")
+        os.makedirs(root, exist_ok=True)
+        self._load_index(only_url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def urls(self) -> list:
+        return list(self.index)
+
+    @classmethod
+    def for_url(cls, root: str, url: str):
+        """
+        Read-only archive that indexes only url, for one-off lookups.
+        Other index lines are skipped by prefix instead of being JSON-parsed.
+        """
+        return cls(root, read_only=True, only_url=url)
+
+    def _load_index(self, only_url: str = None):
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        # record() writes 'url' as the first key, so an entry for only_url starts with this prefix
+        prefix = '{"url": ' + json.dumps(only_url) + ',' if only_url is not None else ''
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.startswith(prefix):
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn last line from an interrupted run; _open_segment cuts it off before appending
+                    continue
+                self.index[entry['url']] = entry
+
+    def _open_segment(self):
+        existing = [n for n in os.listdir(self.root) if n.startswith('segment-')]
+        number = max((int(n[8:14]) for n in existing), default=-1) + 1
+        self._segment_name = f"segment-{number:06d}.seg"
+        self._segment = open(os.path.join(self.root, self._segment_name), 'ab')
+        if self._index_file is None:
+            path = os.path.join(self.root, INDEX_FILE)
+            self._truncate_torn_line(path)
+            self._index_file = open(path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _truncate_torn_line(path: str):
+        """
+        Cuts a partially written last line left by an interrupted run back to the previous
+        newline, so the next record starts on a line of its own instead of being glued to it.
+        The torn record's segment bytes stay orphaned; its index entry was never complete.
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            block = 64 * 1024
+            end = size
+            while end > 0:
+                start = max(end - block, 0)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    @staticmethod
+    def _compress(data: bytes):
+        if zstandard is not None:
+            return 'zstd', zstandard.ZstdCompressor(level=10).compress(data)
+        return 'zlib', zlib.compress(data, 6)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> bytes:
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Archive contains zstd records but the zstandard package is not installed.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def record(self, url: str, resp):
+        """Append a fetched response (anything with status_code, content, encoding) under url."""
+        if self.read_only:
+            raise RuntimeError("Cannot record into a read-only page archive.")
+        codec, blob = self._compress(resp.content)
+        with self._lock:
+            if self._segment is None or self._segment.tell() + len(blob) > self.segment_max_bytes:
+                if self._segment is not None:
+                    self._segment.close()
+                self._open_segment()
+            offset = self._segment.tell()
+            self._segment.write(blob)
+            self._segment.flush()
+            entry = {
+                'url': url,
+                'segment': self._segment_name,
+                'offset': offset,
+                'length': len(blob),
+                'codec': codec,
+                'status': resp.status_code,
+                'encoding': resp.encoding,
+                'fetched_at': time.time(),
+            }
+            # data is flushed before its index line, so the index never points past the segment end
+            self._index_file.write(json.dumps(entry) + '\n')
+            self._index_file.flush()
+            self.index[url] = entry
+
+    def _view(self, segment: str, end: int):
+        mm = self._maps.get(segment)
+        if mm is None or len(mm) < end:
+            # the segment being written grows, so remap when a record lies past the old mapping
+            if mm is not None:
+                mm.close()
+            with open(os.path.join(self.root, segment), 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mm
+        return mm
+
+    def response(self, url: str):
+        """Return the archived page for url as an ArchivedResponse, or None if it was never archived."""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        start, end = entry['offset'], entry['offset'] + entry['length']
+        with self._lock:
+            blob = self._view(entry['segment'], end)[start:end]
+        return ArchivedResponse(url, entry['status'], self._decompress(entry['codec'], blob), entry['encoding'])
+
+    def fetch(self, url: str, get):
+        """
+        Read-only archives serve url from disk (None when missing).
+        Otherwise the page is fetched with get(url) and archived before returning it.
+        """
+        if self.read_only:
+            return self.response(url)
+        resp = get(url)
+        if resp is not None:
+            self.record(url, resp)
+        return resp
+
+    def parse_in_processes(self, parse, urls, max_workers=None):
+        """
+        Runs parse(html, url) over the archived pages of urls in worker processes,
+        so CPU-bound HTML parsing is not serialized by the GIL. Each worker opens
+        its own read-only view of the archive, only URLs and parse results cross
+        process boundaries. parse must be a module-level function. The pool is
+        created on first use and reused until close(), so max_workers only
+        counts on the first call.
+
+        Yields (url, future) pairs as they complete; future.result() raises
+        LookupError for URLs that are not in the archive and requests.HTTPError
+        for pages archived with an error status.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_open_worker_archive,
+                                             initargs=(self.root,))
+        futures = {self._pool.submit(_parse_archived, parse, url): url for url in urls}
+        for future in as_completed(futures):
+            yield futures[future], future
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        with self._lock:
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+
+
+def _open_worker_archive(root):
+    global _worker_archive
+    _worker_archive = PageArchive(root, read_only=True)
+
+
+def _parse_archived(parse, url):
+    resp = _worker_archive.response(url)
+    if resp is None:
+        raise LookupError(f"{url} is not in the page archive.")
+    resp.raise_for_status()
+    return parse(resp.text, url)
@@ -0,0 +1,229 @@
+"""
+Single entry point for the Brembo scraping pipeline.
+
+    python pipeline.py models|relations|products|prices|all [options]
+    python pipeline.py crawl --archive Data/Archive
+    python pipeline.py extract --archive Data/Archive
+    python pipeline.py status
+    python pipeline.py lookup 09.A820.11 --title "Brake discs"
+
+Stage modules (and with them pandas and numpy) are only imported by the
+subcommand that needs them: status loads none of them, and lookup needs bs4
+plus requests only when it fetches live, so both start without waiting on pandas.
+"""
+import argparse
+import contextlib
+import os
+import sys
+
+
+def stage_outputs(data_dir):
+    products_dir = os.path.join(data_dir, 'Products')
+    return {
+        'models': [os.path.join(data_dir, name) for name in
+                   ('brand.csv', 'model.csv', 'type.csv', 'bikeDisplacement.csv', 'bikeYear.csv')],
+        'relations': [os.path.join(products_dir, 'product-relations.csv'),
+                      os.path.join(products_dir, 'bike-product-relations.csv')],
+        'products': [os.path.join(products_dir, 'Vehicle'), os.path.join(products_dir, 'Bike')],
+        'prices': [os.path.join(data_dir, 'Prices_cleaned.csv')],
+    }
+
+
+def is_done(args, stage):
+    if not args.resume or stage == 'products':  # products resume per category
+        return False
+    if all(os.path.exists(p) for p in stage_outputs(args.data_dir)[stage]):
+        print(f"Skipping {stage}, outputs already exist in {args.data_dir}.")
+        return True
+    return False
+
+
+def default_archive(args):
+    return args.archive or os.path.join(args.data_dir, 'Archive')
+
+
+def open_archive(args):
+    if not args.archive:
+        return contextlib.nullcontext()
+    from page_archive import PageArchive
+    return PageArchive(args.archive)
+
+
+def run_models(args):
+    if is_done(args, 'models'):
+        return
+    import bremboparts_models_scraper
+    bremboparts_models_scraper.main(args.data_dir, args.region, args.culture, args.country, args.workers or 20)
+
+
+def scrape_relations(args, archive, max_workers):
+    import brembo_product_relations_scraper
+    type_out, bike_out = stage_outputs(args.data_dir)['relations']
+    brembo_product_relations_scraper.main(os.path.join(args.data_dir, 'type.csv'),
+                                          os.path.join(args.data_dir, 'bikeDisplacement.csv'),
+                                          type_out, bike_out,
+                                          archive=archive, max_workers=max_workers)
+
+
+def scrape_products(args, archive, max_workers, resume=False, country=None):
+    import brembo_product_scraper
+    brembo_product_scraper.main(args.data_dir, archive, max_workers,
+                                args.region, args.culture, resume=resume, country=country)
+
+
+def run_relations(args):
+    if is_done(args, 'relations'):
+        return
+    with open_archive(args) as archive:
+        scrape_relations(args, archive, args.workers or 10)
+
+
+def run_products(args):
+    with open_archive(args) as archive:
+        scrape_products(args, archive, args.workers or 10, args.resume, args.country)
+
+
+def run_prices(args):
+    if is_done(args, 'prices'):
+        return
+    prices_csv = args.prices_csv or os.path.join(args.data_dir, 'Prices.csv')
+    if not os.path.exists(prices_csv):
+        print(f"[WARN] {prices_csv} not found, skipping prices.")
+        return
+    import price_preprocessing
+    price_preprocessing.main(prices_csv, stage_outputs(args.data_dir)['prices'][0])
+
+
+def run_all(args):
+    for run in (run_models, run_relations, run_products, run_prices):
+        run(args)
+
+
+def run_crawl(args):
+    """
+    Always runs both stages in full: crawl exists to fill the archive, so it has no resume,
+    and skipping already scraped outputs would leave pages that extract cannot re-run.
+    """
+    args.archive = default_archive(args)
+    with open_archive(args) as archive:
+        scrape_relations(args, archive, args.workers or 10)
+        scrape_products(args, archive, args.workers or 10, country=args.country)
+
+
+def run_extract(args):
+    """
+    Relations go first because the product stage reads the relations CSVs they produce.
+    Parsing runs in one worker process per CPU unless --workers says otherwise.
+    """
+    from page_archive import PageArchive
+    archive_dir = default_archive(args)
+    try:
+        archive = PageArchive(archive_dir, read_only=True)
+    except FileNotFoundError:
+        sys.exit(f"No page archive at {archive_dir}.")
+    with archive:
+        print(f"Extracting from {len(archive)} archived pages in {archive_dir}")
+        scrape_relations(args, archive, args.workers)
+        scrape_products(args, archive, args.workers)
+
+
+def count_rows(path):
+    with open(path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def run_status(args):
+    for stage, paths in stage_outputs(args.data_dir).items():
+        print(f"{stage}:")
+        for path in paths:
+            if os.path.isdir(path):
+                files = [n for n in os.listdir(path) if n.endswith('.csv')]
+                rows = sum(count_rows(os.path.join(path, n)) for n in files)
+                print(f"  {path}: {len(files)} files, {rows} rows")
+            elif os.path.exists(path):
+                print(f"  {path}: {count_rows(path)} rows")
+            else:
+                print(f"  {path}: missing")
+
+    archive_dir = default_archive(args)
+    index_path = os.path.join(archive_dir, 'index.jsonl')
+    if os.path.exists(index_path):
+        with open(index_path, 'rb') as f:
+            records = sum(1 for _ in f)
+        print(f"archive:\n  {archive_dir}: {records} records")
+
+
+def run_lookup(args):
+    import brembo_product_scraper
+    url = brembo_product_scraper.get_url(args.code, args.title, 1 if args.bike else 0, args.region, args.culture)
+    if args.archive:
+        from page_archive import PageArchive
+        try:
+            archive = PageArchive.for_url(args.archive, url)
+        except FileNotFoundError:
+            sys.exit(f"No page archive at {args.archive}.")
+        with archive:
+            resp = archive.response(url)
+        if resp is None:
+            sys.exit(f"{url} is not in the page archive.")
+    else:
+        resp = brembo_product_scraper.fetch_product_page(url, country=args.country)
+    resp.raise_for_status()
+    row = brembo_product_scraper.parse_product_html(resp.text, url)
+    print(url)
+    for label, value in row.items():
+        print(f"  {label}: {value}")
+
+
+OPTIONS = {
+    'data-dir': dict(default='Data', help="directory for all input and output CSVs"),
+    'workers': dict(type=int, default=None, help="worker threads, or worker processes for extract"),
+    'region': dict(default='europe', help="catalogue region, e.g. europe"),
+    'culture': dict(default='en', help="catalogue language, e.g. en"),
+    'country': dict(default='MK', help="market country code sent as cookie"),
+    'archive': dict(default=None, help="page archive directory; scraping stages record into it, "
+                                       "extract and lookup read from it"),
+    'resume': dict(action='store_true', help="skip stages and categories whose outputs exist"),
+    'prices-csv': dict(default=None, help="raw price list, defaults to <data-dir>/Prices.csv"),
+}
+
+COMMANDS = {
+    'models': (run_models, "scrape brands, models, types and bike displacements",
+               ('data-dir', 'workers', 'region', 'culture', 'country', 'resume')),
+    'relations': (run_relations, "scrape product codes for every type and displacement",
+                  ('data-dir', 'workers', 'archive', 'resume')),
+    'products': (run_products, "scrape product specifications per category",
+                 ('data-dir', 'workers', 'region', 'culture', 'country', 'archive', 'resume')),
+    'prices': (run_prices, "clean the price list",
+               ('data-dir', 'resume', 'prices-csv')),
+    'all': (run_all, "run models, relations, products and prices in order",
+            ('data-dir', 'workers', 'region', 'culture', 'country', 'archive', 'resume', 'prices-csv')),
+    'crawl': (run_crawl, "run relations and products live, archiving every fetched page",
+              ('data-dir', 'workers', 'region', 'culture', 'country', 'archive')),
+    'extract': (run_extract, "re-run relations and products over a page archive, offline",
+                ('data-dir', 'workers', 'region', 'culture', 'archive')),
+    'status': (run_status, "show which stage outputs exist",
+               ('data-dir', 'archive')),
+    'lookup': (run_lookup, "fetch and print the specifications of a single product",
+               ('region', 'culture', 'country', 'archive')),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Brembo catalogue scraping pipeline.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text, options) in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        for option in options:
+            sub.add_argument(f'--{option}', **OPTIONS[option])
+        if name == 'lookup':
+            sub.add_argument('code', help="product code, e.g. 09.A820.11")
+            sub.add_argument('--title', default='Brake discs', help="product category as listed on the site")
+            sub.add_argument('--bike', action='store_true', help="look the code up in the bike catalogue")
+
+    args = parser.parse_args(argv)
+    COMMANDS[args.command][0](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -31,8 +31,8 @@ def format_part_number(pn: str) -> str:
         rest = rest.ljust(5, "0")
         return f"{first} {rest[:2]} {rest[2:5]}"
 
-def main():
-    df = pd.read_csv('Data/Prices.csv')
+def main(input_csv='Data/Prices.csv', output_csv='Data/Prices_cleaned.csv'):
+    df = pd.read_csv(input_csv)
     df.rename(columns={
         " MPC ": "mpc",
         " SO NASA MARZA ": "with margin",
@@ -67,7 +67,7 @@ def main():
     df_cleaned = df[["part_number", "quantity", "mpc", "final_price"]]
 
     # Save
-    df_cleaned.to_csv('Data/Prices_cleaned.csv', index=False)
+    df_cleaned.to_csv(output_csv, index=False)
 
 
 
@@ -0,0 +1,102 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from page_archive import INDEX_FILE, PageArchive
+
+
+def make_response(content: bytes, status_code=200, encoding='utf-8'):
+    return SimpleNamespace(content=content, status_code=status_code, encoding=encoding)
+
+
+def segments(root):
+    return sorted(n for n in os.listdir(root) if n.startswith('segment-'))
+
+
+def test_record_reopen_read(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.record('https://a', make_response('čaša'.encode('utf-8')))
+        archive.record('https://b', make_response(b'not found', status_code=404, encoding=None))
+
+    with PageArchive(str(tmp_path), read_only=True) as archive:
+        assert sorted(archive.urls()) == ['https://a', 'https://b']
+        page = archive.response('https://a')
+        assert page.status_code == 200
+        assert page.text == 'čaša'
+        assert archive.response('https://b').status_code == 404
+        assert archive.response('https://missing') is None
+        assert archive.fetch('https://missing', get=None) is None
+
+
+def test_latest_record_wins(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.record('https://a', make_response(b'old'))
+    with PageArchive(str(tmp_path)) as archive:
+        archive.record('https://a', make_response(b'new'))
+
+    # every reopen writes to a fresh segment, old segments are never touched
+    assert segments(str(tmp_path)) == ['segment-000000.seg', 'segment-000001.seg']
+    with PageArchive(str(tmp_path), read_only=True) as archive:
+        assert len(archive) == 1
+        assert archive.response('https://a').content == b'new'
+
+
+def test_segment_rollover(tmp_path):
+    bodies = {f'https://p/{i}': os.urandom(300) for i in range(10)}
+    with PageArchive(str(tmp_path), segment_max_bytes=1000) as archive:
+        for url, body in bodies.items():
+            archive.record(url, make_response(body))
+
+    assert len(segments(str(tmp_path))) > 1
+    for name in segments(str(tmp_path)):
+        assert os.path.getsize(tmp_path / name) <= 1000
+    with PageArchive(str(tmp_path), read_only=True) as archive:
+        for url, body in bodies.items():
+            assert archive.response(url).content == body
+
+
+def test_read_remaps_growing_segment(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.record('https://a', make_response(b'first'))
+        assert archive.response('https://a').content == b'first'
+        # lies past the mapping made by the read above
+        archive.record('https://b', make_response(b'second' * 100))
+        assert archive.response('https://b').content == b'second' * 100
+
+
+def test_torn_index_line_is_truncated(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.record('https://a', make_response(b'a'))
+    with open(tmp_path / INDEX_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://torn", "segm')
+
+    with PageArchive(str(tmp_path)) as archive:
+        assert archive.urls() == ['https://a']
+        archive.record('https://b', make_response(b'b'))
+
+    with open(tmp_path / INDEX_FILE, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2
+    assert 'torn' not in ''.join(lines)
+    with PageArchive(str(tmp_path), read_only=True) as archive:
+        assert sorted(archive.urls()) == ['https://a', 'https://b']
+        assert archive.response('https://b').content == b'b'
+
+
+def test_for_url_indexes_only_that_url(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.record('https://p/1', make_response(b'one'))
+        archive.record('https://p/10', make_response(b'ten'))
+        archive.record('https://p/1', make_response(b'one again'))
+
+    with PageArchive.for_url(str(tmp_path), 'https://p/1') as archive:
+        assert archive.urls() == ['https://p/1']
+        assert archive.response('https://p/1').content == b'one again'
+    with PageArchive.for_url(str(tmp_path), 'https://p/2') as archive:
+        assert len(archive) == 0
+
+
+def test_missing_read_only_archive(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PageArchive(str(tmp_path / 'absent'), read_only=True)